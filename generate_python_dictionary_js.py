@@ -4,33 +4,76 @@ import argparse
 import json
 import os
 import re
-from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder produces the same output
+    orjson = None
+
+
+# Literal markers used by the dictionary markdown. Parsing runs on the raw UTF-8 bytes:
+# every structural marker is ASCII, so only the captured fields need decoding.
+_DESC = b'**Description**:'
+_EX = b'**Example**:'
+_FENCE = b'```'
+
+# Single pass over the whole document. Alternatives, in document order:
+#   item    - '### ' token headings (also checked as section headers)
+#   section - any other '#' header line, indented or not, that may switch the current item type
+#   desc    - '**Description**:' text up to a blank line, example or next heading
+#   fence   - opening fence of the code block following '**Example**:'; the body and
+#             closing fence are located with bytes.find (see find_closing_fence)
+MASTER_RE = re.compile(
+    rb"^###[^\S\n]+(?P<item>[^\n]*)$"
+    rb"|^[^\S\n]*(?P<section>\#[^\n]*)$"
+    rb"|^[^\S\n]*" + re.escape(_DESC) +
+    rb"(?P<desc>[^\n]*(?:\n(?![^\S\n]*(?:\n|\Z|" + re.escape(_EX) + rb")|###[^\S\n])[^\n]*)*)"
+    rb"|^[^\S\n]*" + re.escape(_EX) + rb"[^\n]*\n(?:[^\S\n]*\n)*"
+    rb"(?P<fence>[^\S\n]*" + re.escape(_FENCE) + rb"[^\n]*)(?:\n|\Z)",
+    re.M,
+)
+BACKTICKED_TOKEN_RE = re.compile(r"^`([^`]+)`$")
+# Bound once; normalize_token runs for every item heading
+_match_backticked = BACKTICKED_TOKEN_RE.match
 
+# Escape backslashes and single quotes for safe JS string literals, encode
+# newlines and drop carriage returns so CRLF text comes out as '\n'
+_JS_TABLE = str.maketrans({'\\': '\\\\', "'": "\\'", '\n': '\\n', '\r': ''})
 
-HEADING_ITEM_RE = re.compile(r"^###\s+(.*)\s*$")
-BACKTICKED_TOKEN_RE = re.compile(r"^`([^`]+)`$")
+# Generated JS files run to hundreds of KB; the 8 KiB default buffer splits them into many writes
+WRITE_BUFFER_SIZE = 1 << 20
 
 
-def read_file(path: str) -> str:
-    with open(path, 'r', encoding='utf-8') as f:
+def read_file(path: str) -> bytes:
+    # Unbuffered binary read pulls the whole file in one go instead of st_blksize-sized chunks.
+    # The content stays undecoded; parse_items decodes only the fields it captures.
+    # CRLF line endings are left in place; the tokenizer treats '\r' as trailing whitespace.
+    with open(path, 'rb', buffering=0) as f:
         return f.read()
 
 
 def normalize_token(raw: str) -> str:
-    m = BACKTICKED_TOKEN_RE.match(raw.strip())
+    raw = raw.strip()
+    m = _match_backticked(raw)
     if m:
         return m.group(1)
-    return raw.strip()
+    return raw
 
 
 def js_escape(s: str) -> str:
-    if s is None:
-        return ''
-    # Escape backslashes and single quotes for safe JS string literals
-    s = s.replace('\\', '\\\\').replace("'", "\\'")
-    # Normalize CRLF and handle newlines in descriptions
-    s = s.replace('\r\n', '\n').replace('\n', '\\n')
-    return s
+    return '' if s is None else s.translate(_JS_TABLE)
+
+
+if orjson is not None:
+    def js_string(s: str) -> str:
+        return orjson.dumps(s).decode('utf-8')
+else:
+    # The stdlib C encoder behind json.dumps(s, ensure_ascii=False); matches orjson byte for byte
+    js_string = json.encoder.encode_basestring
 
 
 class SectionType:
@@ -40,235 +83,240 @@ class SectionType:
     OPERATOR = 'operator'
 
 
-def detect_section_type(line: str, state: Dict[str, str]) -> None:
-    text = line.strip().lower()
+def detect_section_type(header: str, current_type: str) -> str:
+    # Called once per header line matched by MASTER_RE; the match always starts at the '#'
+    text = header.lower()
     # Detect major sections by their headings in the markdown
-    if text.startswith('#') and 'python language reference' in text:
+    if 'python language reference' in text:
         # ignore top title
-        return
+        return current_type
     if text.startswith('##') and 'python builtins' in text:
-        state['current_type'] = SectionType.BUILTIN
-        return
-    if text.startswith('#') and 'python keywords' in text:
-        state['current_type'] = SectionType.KEYWORD
-        return
-    if text.startswith('#') and 'python operators' in text:
-        state['current_type'] = SectionType.OPERATOR
-        return
+        return SectionType.BUILTIN
+    if 'python keywords' in text:
+        return SectionType.KEYWORD
+    if 'python operators' in text:
+        return SectionType.OPERATOR
     # Sub-headers inside builtins are categories; we keep type as builtin
-
-
-def parse_items(md_text: str) -> List[Dict[str, Optional[str]]]:
-    lines = md_text.splitlines()
-    state = { 'current_type': SectionType.NONE }
-    items: List[Dict[str, Optional[str]]] = []
-
-    i = 0
-    n = len(lines)
-    while i < n:
-        line = lines[i]
-        detect_section_type(line, state)
-
-        m = HEADING_ITEM_RE.match(line)
-        if m and state['current_type'] in (SectionType.KEYWORD, SectionType.BUILTIN, SectionType.OPERATOR):
-            token_name_raw = m.group(1)
-            token_name = normalize_token(token_name_raw)
-
-            # Parse description
-            description = ''
-            example = ''
-            found_description = False
-
-            j = i + 1
-            # Find a line starting with **Description**:
-            while j < n and not lines[j].lstrip().startswith('**Description**:'):
-                # Stop early if next heading encountered
-                if HEADING_ITEM_RE.match(lines[j]):
-                    break
-                detect_section_type(lines[j], state)  # allow section changes between headings
-                j += 1
-
-            if j < n and lines[j].lstrip().startswith('**Description**:'):
-                desc_line = lines[j].strip()
-                description = desc_line.split('**Description**:', 1)[1].strip()
-                found_description = True
-                j += 1
-                # Capture subsequent description lines until blank line or Example header or next heading
-                while j < n:
-                    s = lines[j]
-                    if s.strip() == '' or s.lstrip().startswith('**Example**:') or HEADING_ITEM_RE.match(s):
-                        break
-                    description += ('\n' + s.rstrip())
-                    j += 1
-
-            # Find example block
-            while j < n and not lines[j].lstrip().startswith('**Example**:'):
-                if HEADING_ITEM_RE.match(lines[j]):
-                    break
-                j += 1
-
-            if j < n and lines[j].lstrip().startswith('**Example**:'):
-                j += 1
-                # Skip blank lines before looking for fenced code block
-                while j < n and lines[j].strip() == '':
-                    j += 1
-                # Expect fenced code block starting with ```
-                if j < n and lines[j].strip().startswith('```'):
-                    # Extract the fence type (e.g., "```" or "```python")
-                    fence_line = lines[j].strip()
-                    # For closing fence, we just need to match ```
-                    fence = '```'
-                    j += 1
-                    code_lines = []
-                    while j < n and not lines[j].strip().startswith('```'):
-                        code_lines.append(lines[j].rstrip())
-                        j += 1
-                    # Skip closing fence
-                    if j < n and lines[j].strip().startswith('```'):
-                        j += 1
-                    example = '\n'.join(code_lines).rstrip()
-
+    return current_type
+
+
+def clean_block(text: str) -> str:
+    # Right-strip every line of a captured block and trim the block itself
+    return '\n'.join(line.rstrip() for line in text.split('\n')).strip()
+
+
+def find_closing_fence(md_text: bytes, start: int) -> Tuple[int, int]:
+    # Jump between fence markers with bytes.find instead of scanning the code line by line.
+    # Returns (end of the code body, offset just past the closing fence); a closing fence
+    # must begin its line, leading whitespace aside. An unclosed block runs to the end.
+    find = md_text.find
+    k = find(_FENCE, start)
+    while k != -1:
+        nl = md_text.rfind(b'\n', start, k)
+        line_start = start if nl == -1 else nl + 1
+        if not md_text[line_start:k].strip():
+            return line_start, k + len(_FENCE)
+        k = find(_FENCE, k + len(_FENCE))
+    return len(md_text), len(md_text)
+
+
+@dataclass
+class Item:
+    # Slotted: no per-instance __dict__ for the few hundred parsed entries
+    __slots__ = ('token', 'type', 'description', 'example')
+    token: str
+    type: str
+    description: str
+    example: str
+
+
+def parse_items(md_text: bytes) -> Iterator[Item]:
+    # Items are yielded as soon as they are complete, so a consumer such as
+    # merge_items_with_precedence never needs the full list in memory
+    current_type = SectionType.NONE
+
+    # Heading of the item whose **Description**: we are waiting for
+    pending_token: Optional[str] = None
+    # Item with a description, waiting for its **Example**: block
+    current: Optional[Item] = None
+
+    # Local aliases for the per-match calls below
+    normalize = normalize_token
+    clean = clean_block
+
+    search = MASTER_RE.search
+    pos = 0
+    while True:
+        m = search(md_text, pos)
+        if m is None:
+            break
+        pos = m.end()
+        # Exactly one named group takes part in each match
+        kind = m.lastgroup
+        if kind == 'fence':
+            # Always skip the block so nothing inside it is tokenized
+            body_end, pos = find_closing_fence(md_text, pos)
+            if current is not None:
+                # First fenced block after the description is the item's example
+                current.example = clean(md_text[m.end():body_end].decode('utf-8'))
+                yield current
+                current = None
+            continue
+        text = m.group(kind).decode('utf-8')
+        if kind == 'item':
+            # The heading line itself may name a section, as any other '#' line
+            current_type = detect_section_type(m.group(0).decode('utf-8'), current_type)
+            if current is not None:
+                yield current
+                current = None
+            pending_token = None
+            if current_type in (SectionType.KEYWORD, SectionType.BUILTIN, SectionType.OPERATOR):
+                pending_token = normalize(text)
+        elif kind == 'section':
+            current_type = detect_section_type(text, current_type)
+        elif kind == 'desc':
             # Only add entries that have a Description section. This filters out category headings like
             # "Mechanical", "Iteration", etc., which are organizational but not tokens.
-            if found_description:
-                # Set preferred type precedence: keyword > operator > builtin
-                item_type = state['current_type']
-
-                items.append({
-                    'token': token_name,
-                    'type': item_type,
-                    'description': description.strip(),
-                    'example': example.strip() if example else ''
-                })
-
-            # continue scanning from j (avoid re-parsing same content)
-            i = j
-            continue
-
-        i += 1
+            if pending_token is not None:
+                current = Item(pending_token, current_type, clean(text), '')
+                pending_token = None
+            else:
+                # No item owns this description: resume after its first line so section
+                # headers inside the continuation are still tokenized
+                nl = md_text.find(b'\n', m.start())
+                pos = len(md_text) if nl == -1 else nl + 1
 
-    return items
+    if current is not None:
+        yield current
 
 
-def merge_items_with_precedence(items: List[Dict[str, Optional[str]]]) -> Dict[str, Dict[str, Optional[str]]]:
+def merge_items_with_precedence(items: Iterable[Item]) -> Dict[str, Item]:
     precedence = { 'keyword': 3, 'operator': 2, 'builtin': 1 }
-    merged: Dict[str, Dict[str, Optional[str]]] = {}
+    merged: Dict[str, Item] = {}
+    # Builtin versions of False, None, True, collected while merging
+    builtin_versions = []
     for it in items:
-        tok = it['token'] or ''
+        tok = it.token or ''
         if not tok:
             continue
+        if tok in ('False', 'None', 'True') and it.type == 'builtin':
+            builtin_versions.append(it)
         if tok not in merged:
             merged[tok] = it
             continue
+        cur = merged[tok]
         # Special case: False, None, True should be both keyword AND builtin
         # Keep them as keywords but also add builtin versions
-        if tok in ('False', 'None', 'True') and it['type'] == 'builtin' and merged[tok]['type'] == 'keyword':
+        if tok in ('False', 'None', 'True') and it.type == 'builtin' and cur.type == 'keyword':
             # Keep the keyword version, but we'll add a separate builtin entry later
             continue
-        elif tok in ('False', 'None', 'True') and it['type'] == 'keyword' and merged[tok]['type'] == 'builtin':
+        elif tok in ('False', 'None', 'True') and it.type == 'keyword' and cur.type == 'builtin':
             # Replace builtin with keyword (higher precedence)
             merged[tok] = it
             continue
         # Choose by precedence; keep richer description/example if replacing with same precedence
-        if precedence.get(it['type'], 0) > precedence.get(merged[tok]['type'], 0):
+        new_rank = precedence.get(it.type, 0)
+        cur_rank = precedence.get(cur.type, 0)
+        if new_rank > cur_rank:
             merged[tok] = it
-        elif precedence.get(it['type'], 0) == precedence.get(merged[tok]['type'], 0):
+        elif new_rank == cur_rank:
             # Prefer longer description / example
-            if len((it.get('description') or '')) > len((merged[tok].get('description') or '')):
-                merged[tok]['description'] = it.get('description')
-            if len((it.get('example') or '')) > len((merged[tok].get('example') or '')):
-                merged[tok]['example'] = it.get('example')
-    
-    # Add builtin versions of False, None, True if they exist as keywords
-    builtin_versions = []
-    for it in items:
-        tok = it['token'] or ''
-        if tok in ('False', 'None', 'True') and it['type'] == 'builtin':
-            builtin_versions.append(it)
+            new_desc = it.description or ''
+            if len(new_desc) > len(cur.description or ''):
+                cur.description = new_desc
+            new_example = it.example or ''
+            if len(new_example) > len(cur.example or ''):
+                cur.example = new_example
     
     # Add separate builtin entries with modified token names to avoid conflicts
     for builtin_item in builtin_versions:
-        tok = builtin_item['token']
-        if tok in merged and merged[tok]['type'] == 'keyword':
-            # Add as separate builtin entry
+        tok = builtin_item.token
+        if tok in merged and merged[tok].type == 'keyword':
+            # Add as separate builtin entry, keeping the original token name
             builtin_key = f"{tok}_builtin"
-            merged[builtin_key] = {
-                'token': tok,  # Keep original token name
-                'type': 'builtin',
-                'description': builtin_item.get('description', ''),
-                'example': builtin_item.get('example', '')
-            }
+            merged[builtin_key] = Item(tok, 'builtin', builtin_item.description, builtin_item.example)
     
     return merged
 
 
-def to_built_in_definitions_js(merged: Dict[str, Dict[str, Optional[str]]]) -> str:
-    # Create a flat list suitable for module.exports = [ ... ]
-    arr = []
-    for token in sorted(merged.keys(), key=lambda s: s.lower()):
-        it = merged[token]
-        arr.append({
-            'token': token,
-            'type': it.get('type') or '',
-            'description': it.get('description') or '',
-            'example': it.get('example') or ''
-        })
-
-    # Build JS with proper escaping
-    lines: List[str] = []
-    lines.append("// Auto-generated from Python_Dictionary.md. Do not edit manually.")
-    lines.append("module.exports = [")
-    for i, obj in enumerate(arr):
-        comma = ',' if i < len(arr) - 1 else ''
-        lines.append(
-            "  { token: '%s', type: '%s', description: '%s'%s }%s" % (
-                js_escape(obj['token']),
-                js_escape(obj['type']),
-                js_escape(obj['description']),
-                (", example: '%s'" % js_escape(obj['example'])) if obj['example'] else '',
-                comma)
-        )
-    lines.append("];")
-    lines.append("")
-    return '\n'.join(lines)
-
-
-def to_python_dictionary_js(merged_items: Dict[str, Dict[str, Optional[str]]]) -> str:
+def parse_and_merge(md_text: bytes) -> Dict[str, Item]:
+    # Parse and merge in one pass; no intermediate list of raw items is built
+    return merge_items_with_precedence(parse_items(md_text))
+
+
+# Item fields left out of the JS object when empty
+OPTIONAL_ITEM_FIELDS = ('example',)
+
+
+def make_item_emitter(indent: str) -> Callable[[str, Item], str]:
+    # Generate a line builder specialized to Item's fields: key names, field order, indentation
+    # and the optional-field checks are baked into the source, leaving one string encode per field.
+    # The token is passed separately so built-in definitions can emit the merged key instead.
+    parts = [repr(indent + '{ token: ') + ' + s(token)']
+    for field in fields(Item):
+        if field.name == 'token':
+            continue
+        if field.name in OPTIONAL_ITEM_FIELDS:
+            parts.append(f"((', {field.name}: ' + s(it.{field.name})) if it.{field.name} else '')")
+        else:
+            parts.append(f"', {field.name}: ' + s(it.{field.name} or '')")
+    parts.append("' }'")
+    src = 'def emit(token, it):\n    return ' + ' + '.join(parts) + '\n'
+    namespace = {'s': js_string}
+    exec(compile(src, '<item emitter>', 'exec'), namespace)
+    return namespace['emit']
+
+
+_emit_builtin_item = make_item_emitter('  ')
+_emit_section_item = make_item_emitter('        ')
+
+
+def write_built_in_definitions_js(f: TextIO, sorted_items: List[Tuple[str, Item]]) -> None:
+    # Stream a flat list suitable for module.exports = [ ... ] straight to the output file
+    w = f.write
+    w("// Auto-generated from Python_Dictionary.md. Do not edit manually.\n")
+    w("module.exports = [\n")
+    last = len(sorted_items) - 1
+    emit = _emit_builtin_item
+    for i, (token, it) in enumerate(sorted_items):
+        w(emit(token, it))
+        w(',\n' if i < last else '\n')
+    w("];\n")
+
+
+def write_python_dictionary_js(f: TextIO, items_by_type: Dict[str, List[Item]]) -> None:
     # Group by type for sections
     sections: List[Tuple[str, str]] = [
         ('Keywords', 'keyword'),
         ('Builtins', 'builtin'),
         ('Operators & Delimiters', 'operator')
     ]
-    lines: List[str] = []
-    lines.append("// Auto-generated from Python_Dictionary.md. Do not edit manually.")
-    lines.append("module.exports = {")
-    lines.append("  title: 'Python Language Reference',")
-    lines.append("  sections: [")
+    w = f.write
+    w("// Auto-generated from Python_Dictionary.md. Do not edit manually.\n")
+    w("module.exports = {\n")
+    w("  title: 'Python Language Reference',\n")
+    w("  sections: [\n")
 
     for si, (title, typ) in enumerate(sections):
-        lines.append("    {")
-        lines.append("      title: '%s'," % js_escape(title))
-        lines.append("      items: [")
-        section_items = [it for it in merged_items.values() if (it.get('type') == typ)]
-        section_items.sort(key=lambda x: (x.get('token') or '').lower())
+        w("    {\n")
+        w(f"      title: '{js_escape(title)}',\n")
+        w("      items: [\n")
+        section_items = items_by_type.get(typ, [])
+        last = len(section_items) - 1
+        emit = _emit_section_item
         for ii, it in enumerate(section_items):
-            comma = ',' if ii < len(section_items) - 1 else ''
-            lines.append(
-                "        { token: '%s', type: '%s', description: '%s'%s }%s" % (
-                    js_escape(it.get('token') or ''),
-                    js_escape(it.get('type') or ''),
-                    js_escape(it.get('description') or ''),
-                    (", example: '%s'" % js_escape(it.get('example') or '')) if (it.get('example')) else '',
-                    comma)
-            )
-        lines.append("      ]")
-        lines.append("    }%s" % (',' if si < len(sections) - 1 else ''))
-
-    lines.append("  ]")
-    lines.append("};")
-    lines.append("")
-    return '\n'.join(lines)
+            w(emit(it.token or '', it))
+            w(',\n' if ii < last else '\n')
+        w("      ]\n")
+        w(f"    }}{',' if si < len(sections) - 1 else ''}\n")
+
+    w("  ]\n")
+    w("};\n")
+
+
+def write_js_file(path: str, writer: Callable[[TextIO, Any], None], data: Any) -> None:
+    with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+        writer(f, data)
 
 
 def main():
@@ -280,21 +328,27 @@ def main():
     args = parser.parse_args()
 
     md = read_file(args.source)
-    raw_items = parse_items(md)
-    merged_map = merge_items_with_precedence(raw_items)
+    merged_map = parse_and_merge(md)
 
     # Prepare outputs
     os.makedirs(args.out_dir, exist_ok=True)
     builtins_path = os.path.join(args.out_dir, args.builtins_out)
     dictionary_path = os.path.join(args.out_dir, args.dictionary_out)
 
-    builtins_js = to_built_in_definitions_js(merged_map)
-    dictionary_js = to_python_dictionary_js(merged_map)
-
-    with open(builtins_path, 'w', encoding='utf-8') as f:
-        f.write(builtins_js)
-    with open(dictionary_path, 'w', encoding='utf-8') as f:
-        f.write(dictionary_js)
+    # Sort once; both outputs are ordered case-insensitively by token
+    sorted_items = sorted(merged_map.items(), key=lambda kv: kv[0].lower())
+    items_by_type: Dict[str, List[Item]] = defaultdict(list)
+    for _, it in sorted_items:
+        items_by_type[it.type or ''].append(it)
+
+    # The two outputs are independent; write them concurrently
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        futures = [
+            ex.submit(write_js_file, builtins_path, write_built_in_definitions_js, sorted_items),
+            ex.submit(write_js_file, dictionary_path, write_python_dictionary_js, items_by_type)
+        ]
+        for future in futures:
+            future.result()  # re-raise any write error
 
     print(f"Wrote {builtins_path}")
     print(f"Wrote {dictionary_path}")